@@ -552,8 +552,9 @@ class EnvBatch(EnvBase):
                 if user_prereq is not None:
                     dep_jobs.append(user_prereq)
                 for dep in deps:
-                    if dep in depid.keys() and depid[dep] is not None:
-                        dep_jobs.append(str(depid[dep]))
+                    dep_id = depid.get(dep)
+                    if dep_id is not None:
+                        dep_jobs.append(str(dep_id))
                 if prev_job is not None:
                     dep_jobs.append(prev_job)
 
@@ -699,9 +700,7 @@ class EnvBatch(EnvBase):
             expect(separator_string is not None,"depend_separator string not defined")
 
             expect("jobid" in dep_string, "depend_string is missing jobid for prerequisite jobs")
-            dep_ids_str = str(dep_jobs[0])
-            for dep_id in dep_jobs[1:]:
-                dep_ids_str += separator_string + str(dep_id)
+            dep_ids_str = separator_string.join(str(dep_id) for dep_id in dep_jobs)
             dep_string = dep_string.replace("jobid",dep_ids_str.strip()) # pylint: disable=maybe-no-member
             submitargs += " " + dep_string
 
@@ -10,6 +10,17 @@ from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
+# Attribute values are regular expressions that are matched against case
+# values once per module/environment node; compile each one only once.
+_ATTRIB_REGEXES = {}
+
+def _get_attrib_regex(xml_value):
+    regex = _ATTRIB_REGEXES.get(xml_value)
+    if regex is None:
+        regex = re.compile(xml_value + "$")
+        _ATTRIB_REGEXES[xml_value] = regex
+    return regex
+
 # Is not of type EntryID but can use functions from EntryID (e.g
 # get_type) otherwise need to implement own functions and make GenericXML parent class
 class EnvMachSpecific(EnvBase):
@@ -273,12 +284,15 @@ class EnvMachSpecific(EnvBase):
     def _compute_actions(self, nodes, child_tag, case, job=None):
         result = [] # list of tuples ("name", "argument")
         compiler, mpilib = case.get_value("COMPILER"), case.get_value("MPILIB")
+        # Many nodes share the same attributes (e.g. compiler="intel"), so
+        # only match each distinct set of attributes once
+        matches = {}
 
         for node in nodes:
-            if (self._match_attribs(self.attrib(node), case, job=job)):
+            if (self._match_attribs_memo(self.attrib(node), case, matches, job=job)):
                 for child in self.get_children(root=node):
                     expect(self.name(child) == child_tag, "Expected {} element".format(child_tag))
-                    if (self._match_attribs(self.attrib(child), case, job=job)):
+                    if (self._match_attribs_memo(self.attrib(child), case, matches, job=job)):
                         val = self.text(child)
                         if val is not None:
                             # We allow a couple special substitutions for these fields
@@ -297,6 +311,13 @@ class EnvMachSpecific(EnvBase):
 
         return result
 
+    def _match_attribs_memo(self, attribs, case, matches, job=None):
+        # name and source are not matched, leave them out of the key
+        key = tuple(sorted(item for item in attribs.items() if item[0] not in ("name", "source")))
+        if key not in matches:
+            matches[key] = self._match_attribs(attribs, case, job=job)
+        return matches[key]
+
     def _match_attribs(self, attribs, case, job=None):
         # check for matches with case-vars
         for attrib in attribs:
@@ -323,12 +344,12 @@ class EnvMachSpecific(EnvBase):
 
     def _match(self, my_value, xml_value):
         if xml_value.startswith("!"):
-            result = re.match(xml_value[1:] + "$",str(my_value)) is None
+            result = _get_attrib_regex(xml_value[1:]).match(str(my_value)) is None
         elif isinstance(my_value, bool):
             if my_value: result = xml_value == "TRUE"
             else: result = xml_value == "FALSE"
         else:
-            result = re.match(xml_value + "$",str(my_value)) is not None
+            result = _get_attrib_regex(xml_value).match(str(my_value)) is not None
 
         logger.debug("(env_mach_specific) _match {} {} {}".format(my_value, xml_value, result))
         return result
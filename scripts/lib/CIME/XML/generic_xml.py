@@ -15,8 +15,16 @@ from collections import namedtuple
 
 logger = logging.getLogger(__name__)
 
+# References resolved by GenericXML.get_resolved_value
+_REFERENCE_RE = re.compile(r'\${?(\w+)}?')
+_ENV_REF_RE   = re.compile(r'\$ENV\{(\w+)\}')
+_SHELL_REF_RE = re.compile(r'\$SHELL\{([^}]+)\}')
+_MATH_RE      = re.compile(r'\s[+-/*]\s')
+
 class _Element(object): # private class, don't want users constructing directly or calling methods on it
 
+    __slots__ = ("xml_element",)
+
     def __init__(self, xml_element):
         self.xml_element = xml_element
 
@@ -36,6 +44,8 @@ class _Element(object): # private class, don't want users constructing directly
 
 class GenericXML(object):
 
+    __slots__ = ("tree", "root", "locked", "read_only", "filename", "needsrewrite")
+
     _FILEMAP = {}
     DISABLE_CACHING = False
     CacheEntry = namedtuple("CacheEntry", ["tree", "root", "modtime"])
@@ -85,9 +95,11 @@ class GenericXML(object):
         Read and parse an xml file into the object
         """
         cached_read = False
+        # Stat the file before parsing so that a change made while it is being
+        # read makes the cache entry stale rather than hiding the change
+        timestamp_file = os.path.getmtime(infile)
         if not self.DISABLE_CACHING and infile in self._FILEMAP:
             timestamp_cache = self._FILEMAP[infile].modtime
-            timestamp_file  = os.path.getmtime(infile)
             if timestamp_file == timestamp_cache:
                 logger.debug("read (cached): {}".format(infile))
                 expect(self.read_only or not self.filename or not self.needsrewrite,
@@ -101,12 +113,13 @@ class GenericXML(object):
             with file_open(infile) as fd:
                 self.read_fd(fd)
 
-            if schema is not None and self.get_version() > 1.0:
+            version = self.get_version()
+            if schema is not None and version > 1.0:
                 self.validate_xml_file(infile, schema)
 
-            logger.debug("File version is {}".format(str(self.get_version())))
+            logger.debug("File version is {}".format(str(version)))
 
-            self._FILEMAP[infile] = self.CacheEntry(self.tree, self.root, os.path.getmtime(infile))
+            self._FILEMAP[infile] = self.CacheEntry(self.tree, self.root, timestamp_file)
 
     def read_fd(self, fd):
         expect(self.read_only or not self.filename or not self.needsrewrite,
@@ -488,10 +501,6 @@ class GenericXML(object):
         True
         """
         logger.debug("raw_value {}".format(raw_value))
-        reference_re = re.compile(r'\${?(\w+)}?')
-        env_ref_re   = re.compile(r'\$ENV\{(\w+)\}')
-        shell_ref_re = re.compile(r'\$SHELL\{([^}]+)\}')
-        math_re = re.compile(r'\s[+-/*]\s')
         item_data = raw_value
 
         if item_data is None:
@@ -500,40 +509,42 @@ class GenericXML(object):
         if not isinstance(item_data, six.string_types):
             return item_data
 
-        for m in env_ref_re.finditer(item_data):
-            logger.debug("look for {} in env".format(item_data))
-            env_var = m.groups()[0]
-            env_var_exists = env_var in os.environ
-            if not allow_unresolved_envvars:
-                expect(env_var_exists, "Undefined env var '{}'".format(env_var))
-            if env_var_exists:
-                item_data = item_data.replace(m.group(), os.environ[env_var])
-
-        for s in shell_ref_re.finditer(item_data):
-            logger.debug("execute {} in shell".format(item_data))
-            shell_cmd = s.groups()[0]
-            item_data = item_data.replace(s.group(), run_cmd_no_fail(shell_cmd))
-
-        for m in reference_re.finditer(item_data):
-            var = m.groups()[0]
-            logger.debug("find: {}".format(var))
-            # The overridden versions of this method do not simply return None
-            # so the pylint should not be flagging this
-            ref = self.get_value(var) # pylint: disable=assignment-from-none
-
-            if ref is not None:
-                logger.debug("resolve: " + str(ref))
-                item_data = item_data.replace(m.group(), self.get_resolved_value(str(ref)))
-            elif var == "CIMEROOT":
-                cimeroot = get_cime_root()
-                item_data = item_data.replace(m.group(), cimeroot)
-            elif var == "SRCROOT":
-                srcroot = get_src_root()
-                item_data = item_data.replace(m.group(), srcroot)
-            elif var == "USER":
-                item_data = item_data.replace(m.group(), getpass.getuser())
-
-        if math_re.search(item_data):
+        # Only strings containing a $ can hold references
+        if "$" in item_data:
+            for m in _ENV_REF_RE.finditer(item_data):
+                logger.debug("look for {} in env".format(item_data))
+                env_var = m.groups()[0]
+                env_var_exists = env_var in os.environ
+                if not allow_unresolved_envvars:
+                    expect(env_var_exists, "Undefined env var '{}'".format(env_var))
+                if env_var_exists:
+                    item_data = item_data.replace(m.group(), os.environ[env_var])
+
+            for s in _SHELL_REF_RE.finditer(item_data):
+                logger.debug("execute {} in shell".format(item_data))
+                shell_cmd = s.groups()[0]
+                item_data = item_data.replace(s.group(), run_cmd_no_fail(shell_cmd))
+
+            for m in _REFERENCE_RE.finditer(item_data):
+                var = m.groups()[0]
+                logger.debug("find: {}".format(var))
+                # The overridden versions of this method do not simply return None
+                # so the pylint should not be flagging this
+                ref = self.get_value(var) # pylint: disable=assignment-from-none
+
+                if ref is not None:
+                    logger.debug("resolve: " + str(ref))
+                    item_data = item_data.replace(m.group(), self.get_resolved_value(str(ref)))
+                elif var == "CIMEROOT":
+                    cimeroot = get_cime_root()
+                    item_data = item_data.replace(m.group(), cimeroot)
+                elif var == "SRCROOT":
+                    srcroot = get_src_root()
+                    item_data = item_data.replace(m.group(), srcroot)
+                elif var == "USER":
+                    item_data = item_data.replace(m.group(), getpass.getuser())
+
+        if _MATH_RE.search(item_data):
             try:
                 tmp = eval(item_data)
             except Exception:
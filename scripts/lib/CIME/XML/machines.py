@@ -6,12 +6,47 @@ from CIME.XML.generic_xml import GenericXML
 from CIME.XML.files import Files
 from CIME.utils import convert_to_unknown_type, get_cime_config, get_all_cime_models
 
-import socket
+import errno, socket
 
 logger = logging.getLogger(__name__)
 
+# Host name lookups can block for seconds on hosts with a misconfigured DNS,
+# so only do them once per process.
+_HOST_NAMES = {}
+
+def _cached_getfqdn():
+    if "fqdn" not in _HOST_NAMES:
+        _HOST_NAMES["fqdn"] = socket.getfqdn()
+    return _HOST_NAMES["fqdn"]
+
+def _cached_gethostname():
+    if "hostname" not in _HOST_NAMES:
+        _HOST_NAMES["hostname"] = socket.gethostname()
+    return _HOST_NAMES["hostname"]
+
+# A NODENAME_REGEX without any of these characters is a plain host name prefix
+_REGEX_METACHARS = re.compile(r"[.^$*+?()\[\]{}|\\]")
+# Inline flags such as (?i) apply to the whole pattern on older pythons, so a
+# NODENAME_REGEX using them would change how every other machine matches if
+# the patterns were combined
+_REGEX_INLINE_FLAGS = re.compile(r"\(\?[aiLmsux-]")
+_REGEX_DEFAULT_FLAGS = re.compile("").flags
+
+# Machine fields reported by Machines.return_values and their keys
+_RETURN_VALUES_FIELDS = {"DESC"                  : "description",
+                         "OS"                    : "os",
+                         "COMPILERS"             : "compilers",
+                         "MAX_TASKS_PER_NODE"    : "max_tasks_per_node",
+                         "MAX_MPITASKS_PER_NODE" : "max_mpitasks_per_node",
+                         "MAX_GPUS_PER_NODE"     : "max_gpus_per_node"}
+
 class Machines(GenericXML):
 
+    __slots__ = ("machine_node", "machine", "machines_dir", "custom_settings",
+                 "_compiled_node_regexes", "_combined_node_regex", "_machine_nodes",
+                 "_machine_index", "_suffix_cache", "_value_cache", "_text_cache",
+                 "_env_lookups")
+
     def __init__(self, infile=None, files=None, machine=None, extra_machines_dir=None):
         """
         initialize an object
@@ -29,6 +64,14 @@ class Machines(GenericXML):
         self.machine = None
         self.machines_dir = None
         self.custom_settings = {}
+        self._compiled_node_regexes = None
+        self._combined_node_regex = None
+        self._machine_nodes = None
+        self._machine_index = None
+        self._suffix_cache = None
+        self._value_cache = {}
+        self._text_cache = {}
+        self._env_lookups = 0
         schema = None
         supported_models = []
         if files is None:
@@ -50,13 +93,11 @@ class Machines(GenericXML):
         # This could cause problems if node matches are repeated when only one is expected.
         local_infile = os.path.join(os.environ.get("HOME"),".cime","config_machines.xml")
         logger.debug("Infile: {}".format(local_infile))
-        if os.path.exists(local_infile):
-            GenericXML.read(self, local_infile, schema)
+        self._read_optional_file(local_infile, schema)
         if extra_machines_dir:
             local_infile = os.path.join(extra_machines_dir, "config_machines.xml")
             logger.debug("Infile: {}".format(local_infile))
-            if os.path.exists(local_infile):
-                GenericXML.read(self, local_infile, schema)
+            self._read_optional_file(local_infile, schema)
 
         if machine is None:
             if "CIME_MACHINE" in os.environ:
@@ -68,10 +109,11 @@ class Machines(GenericXML):
                 if machine is None:
                     machine = self.probe_machine_name()
                     if machine is None:
+                        config_root = os.path.join(get_cime_root(), "config")
                         for potential_model in get_all_cime_models():
-                            local_infile = os.path.join(get_cime_root(), "config",potential_model,"machines","config_machines.xml")
+                            local_infile = os.path.join(config_root, potential_model, "machines", "config_machines.xml")
                             if local_infile != infile:
-                                GenericXML.read(self, local_infile, schema)
+                                self.read(local_infile, schema)
                                 if self.probe_machine_name() is not None:
                                     supported_models.append(potential_model)
                                 GenericXML.change_file(self, infile, schema)
@@ -79,6 +121,60 @@ class Machines(GenericXML):
         expect(machine is not None, "Could not initialize machine object from {} or {}. This machine is not available for the target CIME_MODEL. The supported CIME_MODELS that can be used are: {}".format(infile, local_infile, supported_models))
         self.set_machine(machine)
 
+    def _read_optional_file(self, infile, schema):
+        """
+        Append the contents of infile if it exists. Rather than stat'ing the
+        file first, just try to read it. Returns True if the file was read.
+        """
+        try:
+            self.read(infile, schema)
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT or e.filename != infile:
+                raise
+            return False
+
+        return True
+
+    def read(self, infile, schema=None):
+        """
+        Read infile, appending to any xml already read
+        """
+        GenericXML.read(self, infile, schema)
+        self._reset_machine_caches()
+
+    def _reset_machine_caches(self):
+        """
+        Forget everything derived from the xml tree, needed whenever it is
+        replaced or extended
+        """
+        self._compiled_node_regexes = None
+        self._combined_node_regex = None
+        self._machine_nodes = None
+        self._machine_index = None
+        self._suffix_cache = None
+        self._value_cache = {}
+        self._text_cache = {}
+
+    def _get_machine_nodes(self):
+        """
+        Return the list of all <machine> nodes, in file order
+        """
+        if self._machine_nodes is None:
+            self._machine_nodes = self.get_children("machine")
+
+        return self._machine_nodes
+
+    def _get_machine_index(self):
+        """
+        Return a dict mapping each MACH name to the list of its <machine> nodes
+        """
+        if self._machine_index is None:
+            self._machine_index = {}
+            for node in self._get_machine_nodes():
+                self._machine_index.setdefault(self.get(node, "MACH"), []).append(node)
+
+        return self._machine_index
+
     def get_child(self, name=None, attributes=None, root=None, err_msg=None):
         if root is None:
             root = self.machine_node
@@ -117,12 +213,7 @@ class Machines(GenericXML):
         """
         Return a list of machines defined for a given CIME_MODEL
         """
-        machines = []
-        nodes  = self.get_children("machine")
-        for node in nodes:
-            mach = self.get(node, "MACH")
-            machines.append(mach)
-        return machines
+        return [self.get(node, "MACH") for node in self._get_machine_nodes()]
 
     def probe_machine_name(self, warn=True):
         """
@@ -132,13 +223,13 @@ class Machines(GenericXML):
 
         names_not_found = []
 
-        nametomatch = socket.getfqdn()
+        nametomatch = _cached_getfqdn()
         machine = self._probe_machine_name_one_guess(nametomatch)
 
         if machine is None:
             names_not_found.append(nametomatch)
 
-            nametomatch = socket.gethostname()
+            nametomatch = _cached_gethostname()
             machine = self._probe_machine_name_one_guess(nametomatch)
 
             if machine is None:
@@ -151,6 +242,56 @@ class Machines(GenericXML):
 
         return machine
 
+    def _get_compiled_node_regexes(self):
+        """
+        Return a list of (machine name, compiled regex, literal prefix)
+        tuples in file order. NODENAME_REGEX values without regex
+        metacharacters are stored as a literal prefix (with regex None) to be
+        matched with str.startswith, which gives the same result as re.match
+        at a fraction of the cost; the rest are compiled only once.
+
+        Alongside the list, try to build a single alternation of all the
+        patterns, each wrapped in its own named group, so that a probe is a
+        single match. Alternatives are tried left to right, so the first
+        machine in the file still wins. Patterns that use their own named
+        groups, numbered backreferences or inline flags cannot be safely
+        combined; in that case (or if the combined pattern fails to compile)
+        the probe falls back to matching the patterns one at a time.
+        """
+        if self._compiled_node_regexes is None:
+            self._compiled_node_regexes = []
+            self._combined_node_regex = None
+            regex_strs = []
+            combinable = True
+            get, get_optional_child, text = self.get, self.get_optional_child, self.text
+            for node in self._get_machine_nodes():
+                machtocheck = get(node, "MACH")
+                logger.debug("machine is " + machtocheck)
+                regex_str_node = get_optional_child("NODENAME_REGEX", root=node)
+                regex_str = machtocheck if regex_str_node is None else text(regex_str_node)
+
+                if regex_str is not None:
+                    logger.debug("machine regex string is " + regex_str)
+                    regex = None
+                    if _REGEX_METACHARS.search(regex_str) is not None:
+                        regex = re.compile(regex_str)
+                        if regex.groupindex or re.search(r"\\[1-9]", regex_str) or \
+                           regex.flags != _REGEX_DEFAULT_FLAGS or _REGEX_INLINE_FLAGS.search(regex_str):
+                            combinable = False
+
+                    self._compiled_node_regexes.append((machtocheck, regex, regex_str))
+                    regex_strs.append(regex_str)
+
+            if regex_strs and combinable:
+                combined = "|".join("(?P<m{:d}>{})".format(idx, regex_str) for idx, regex_str in enumerate(regex_strs))
+                try:
+                    self._combined_node_regex = re.compile(combined)
+                except (re.error, AssertionError, OverflowError):
+                    # python2 limits the number of named groups in a pattern
+                    logger.debug("Could not combine NODENAME_REGEX patterns")
+
+        return self._compiled_node_regexes
+
     def _probe_machine_name_one_guess(self, nametomatch):
         """
         Find a matching regular expression for nametomatch in the NODENAME_REGEX
@@ -158,22 +299,20 @@ class Machines(GenericXML):
         """
 
         machine = None
-        nodes = self.get_children("machine")
-
-        for node in nodes:
-            machtocheck = self.get(node, "MACH")
-            logger.debug("machine is " + machtocheck)
-            regex_str_node = self.get_optional_child("NODENAME_REGEX", root=node)
-            regex_str = machtocheck if regex_str_node is None else self.text(regex_str_node)
-
-            if regex_str is not None:
-                logger.debug("machine regex string is " + regex_str)
-                regex = re.compile(regex_str)
-                if regex.match(nametomatch):
-                    logger.debug("Found machine: {} matches {}".format(machtocheck, nametomatch))
+        node_regexes = self._get_compiled_node_regexes()
+        if self._combined_node_regex is not None:
+            m = self._combined_node_regex.match(nametomatch)
+            if m is not None:
+                machine = node_regexes[int(m.lastgroup[1:])][0]
+        else:
+            for machtocheck, regex, prefix in node_regexes:
+                if nametomatch.startswith(prefix) if regex is None else regex.match(nametomatch):
                     machine = machtocheck
                     break
 
+        if machine is not None:
+            logger.debug("Found machine: {} matches {}".format(machine, nametomatch))
+
         return machine
 
     def set_machine(self, machine):
@@ -191,8 +330,12 @@ class Machines(GenericXML):
         if machine == "Query":
             self.machine = machine
         elif self.machine != machine or self.machine_node is None:
-            self.machine_node = super(Machines,self).get_child("machine", {"MACH" : machine}, err_msg="No machine {} found".format(machine))
+            nodes = self._get_machine_index().get(machine, [])
+            expect(len(nodes) == 1, "No machine {} found".format(machine))
+            self.machine_node = nodes[0]
             self.machine = machine
+            self._value_cache = {}
+            self._text_cache = {}
 
         return machine
 
@@ -208,6 +351,17 @@ class Machines(GenericXML):
         if name in self.custom_settings:
             return self.custom_settings[name]
 
+        # Values are cached unless they depend on the environment, which may
+        # change between calls; _env_lookups counts such lookups, hits and
+        # misses alike, including those made while resolving references to
+        # other variables. The raw xml text (or None for a miss) is cached
+        # separately so that values which must be re-resolved do not walk the
+        # machine node again.
+        cache_key = (name, tuple(sorted(attributes.items())) if attributes else None, resolved)
+        if cache_key in self._value_cache:
+            return self._value_cache[cache_key]
+        env_lookups = self._env_lookups
+
         # COMPILER and MPILIB are special, if called without arguments they get the default value from the
         # COMPILERS and MPILIBS lists in the file.
         if name == "COMPILER":
@@ -215,18 +369,33 @@ class Machines(GenericXML):
         elif name == "MPILIB":
             value = self.get_default_MPIlib(attributes)
         else:
-            node = self.get_optional_child(name, root=self.machine_node, attributes=attributes)
-            if node is not None:
-                value = self.text(node)
+            text_key = cache_key[:2]
+            if text_key in self._text_cache:
+                value = self._text_cache[text_key]
+            else:
+                node = self.get_optional_child(name, root=self.machine_node, attributes=attributes)
+                if node is not None:
+                    value = self.text(node)
+                self._text_cache[text_key] = value
 
         if resolved:
             if value is not None:
+                if "$ENV" in value or "$SHELL" in value:
+                    self._env_lookups += 1
                 value = self.get_resolved_value(value)
-            elif name in os.environ:
-                value = os.environ[name]
+                # A reference that could not be resolved yet may resolve later
+                if "$" in value:
+                    self._env_lookups += 1
+            else:
+                # The variable may be set in the environment later
+                self._env_lookups += 1
+                value = os.environ.get(name)
 
             value = convert_to_unknown_type(value)
 
+        if env_lookups == self._env_lookups:
+            self._value_cache[cache_key] = value
+
         return value
 
     def get_field_from_list(self, listname, reqval=None, attributes=None):
@@ -238,7 +407,7 @@ class Machines(GenericXML):
         expect(self.machine_node is not None, "Machine object has no machine defined")
         supported_values = self.get_value(listname, attributes=attributes)
         # if no match with attributes, try without
-        if supported_values is None:
+        if supported_values is None and attributes:
             supported_values = self.get_value(listname, attributes=None)
 
         expect(supported_values is not None,
@@ -318,61 +487,81 @@ class Machines(GenericXML):
         return result
 
     def get_suffix(self, suffix_type):
-        node = self.get_optional_child("default_run_suffix")
-        if node is not None:
-            suffix_node = self.get_optional_child(suffix_type, root=node)
-            if suffix_node is not None:
-                return self.text(suffix_node)
+        if self._suffix_cache is None:
+            self._suffix_cache = {}
+            node = self.get_optional_child("default_run_suffix")
+            if node is not None:
+                for suffix_node in self.get_children(root=node):
+                    self._suffix_cache[self.name(suffix_node)] = self.text(suffix_node)
 
-        return None
+        return self._suffix_cache.get(suffix_type)
 
     def set_value(self, vid, value, subgroup=None, ignore_type=True):
         # A temporary cache only
         self.custom_settings[vid] = value
+        self._value_cache = {}
 
-    def print_values(self):
+    def print_values(self, out=None):
+        """
+        Write a summary of every machine to out (default sys.stdout)
+
+        The output is collected and written with a single write, rather than
+        one print per line.
+        """
+        out = sys.stdout if out is None else out
         # write out machines
-        machines = self.get_children("machine")
+        machines = self._get_machine_nodes()
         logger.info("Machines")
+        # bind the accessors used for every machine to locals
+        get, get_child, get_optional_child, text = self.get, self.get_child, self.get_optional_child, self.text
+        lines = []
         for machine in machines:
-            name = self.get(machine, "MACH")
-            desc = self.get_child("DESC", root=machine)
-            os_  = self.get_child("OS", root=machine)
-            compilers = self.get_child("COMPILERS", root=machine)
-            max_tasks_per_node = self.get_child("MAX_TASKS_PER_NODE", root=machine)
-            max_mpitasks_per_node = self.get_child("MAX_MPITASKS_PER_NODE", root=machine)
-            max_gpus_per_node = self.get_child("MAX_GPUS_PER_NODE", root=machine)
-
-            print( "  {} : {} ".format(name , self.text(desc)))
-            print( "      os             ", self.text(os_))
-            print( "      compilers      ",self.text(compilers))
+            name = get(machine, "MACH")
+            desc = get_child("DESC", root=machine)
+            os_  = get_child("OS", root=machine)
+            compilers = get_child("COMPILERS", root=machine)
+            max_tasks_per_node = get_optional_child("MAX_TASKS_PER_NODE", root=machine)
+            max_mpitasks_per_node = get_optional_child("MAX_MPITASKS_PER_NODE", root=machine)
+            max_gpus_per_node = get_optional_child("MAX_GPUS_PER_NODE", root=machine)
+
+            lines.append("  {} : {} ".format(name , text(desc)))
+            lines.append("      os              {}".format(text(os_)))
+            lines.append("      compilers       {}".format(text(compilers)))
             if max_mpitasks_per_node is not None:
-                print("      pes/node       ",self.text(max_mpitasks_per_node))
+                lines.append("      pes/node        {}".format(text(max_mpitasks_per_node)))
             if max_tasks_per_node is not None:
-                print("      max_tasks/node ",self.text(max_tasks_per_node))
+                lines.append("      max_tasks/node  {}".format(text(max_tasks_per_node)))
             if max_gpus_per_node is not None:
-                print("      max_gpus/node ",self.text(max_gpus_per_node))
+                lines.append("      max_gpus/node  {}".format(text(max_gpus_per_node)))
+
+        if lines:
+            out.write("\n".join(lines) + "\n")
 
     def return_values(self):
         """ return a dictionary of machine info
         This routine is used by external tools in https://github.com/NCAR/CESM_xml2html
         """
-        machines = self.get_children("machine")
+        machines = self._get_machine_nodes()
         mach_dict = dict()
         logger.debug("Machines return values")
+        # bind the accessors used for every machine to locals
+        get, get_children, name_of, text, attrib = self.get, self.get_children, self.name, self.text, self.attrib
         for machine in machines:
-            name = self.get(machine, "MACH")
-            desc = self.get_child("DESC", root=machine)
-            mach_dict[(name,"description")] = self.text(desc)
-            os_  = self.get_child("OS", root=machine)
-            mach_dict[(name,"os")] = self.text(os_)
-            compilers = self.get_child("COMPILERS", root=machine)
-            mach_dict[(name,"compilers")] = self.text(compilers)
-            max_tasks_per_node = self.get_child("MAX_TASKS_PER_NODE", root=machine)
-            mach_dict[(name,"max_tasks_per_node")] = self.text(max_tasks_per_node)
-            max_mpitasks_per_node = self.get_child("MAX_MPITASKS_PER_NODE", root=machine)
-            mach_dict[(name,"max_mpitasks_per_node")] = self.text(max_mpitasks_per_node)
-            max_gpus_per_node = self.get_child("MAX_GPUS_PER_NODE", root=machine)
-            mach_dict[(name,"max_gpus_per_node")] = self.text(max_gpus_per_node)
+            name = get(machine, "MACH")
+            # a single pass over the children of each machine, fields that are
+            # not defined for a machine are None. As with get_child, an entry
+            # without attributes is preferred over one with (e.g. compiler=)
+            for key in _RETURN_VALUES_FIELDS.values():
+                mach_dict[(name, key)] = None
+            plain_keys = set()
+            for child in get_children(root=machine):
+                key = _RETURN_VALUES_FIELDS.get(name_of(child))
+                if key is None or key in plain_keys:
+                    continue
+                if not attrib(child):
+                    plain_keys.add(key)
+                    mach_dict[(name, key)] = text(child)
+                elif mach_dict[(name, key)] is None:
+                    mach_dict[(name, key)] = text(child)
 
         return mach_dict
@@ -289,11 +289,13 @@ class Case(object):
         return newcase
 
     def flush(self, flushall=False):
-        if not os.path.isdir(self._caseroot):
+        # Each env file tracks whether it has changed, so only those need writing
+        env_files = self._files if flushall else [env_file for env_file in self._files if env_file.needsrewrite]
+        if not env_files or not os.path.isdir(self._caseroot):
             # do not flush if caseroot wasnt created
             return
 
-        for env_file in self._files:
+        for env_file in env_files:
             env_file.write(force_write=flushall)
 
     def get_values(self, item, attribute=None, resolved=True, subgroup=None):
@@ -10,7 +10,7 @@ from six.moves                      import configparser
 from CIME.XML.standard_module_setup import *
 from CIME.utils                     import expect, run_and_log_case_status, CIMEError
 from CIME.locked_files              import unlock_file, lock_file
-from CIME.test_status               import *
+from CIME.test_status               import TestStatus, SUBMIT_PHASE, TEST_PASS_STATUS, TEST_FAIL_STATUS
 
 import socket
 
@@ -18,10 +18,7 @@ logger = logging.getLogger(__name__)
 
 def _build_prereq_str(case, prev_job_ids):
     delimiter = case.get_value("depend_separator")
-    prereq_str = ""
-    for job_id in prev_job_ids.values():
-        prereq_str += str(job_id) + delimiter
-    return prereq_str[:-1]
+    return delimiter.join(str(job_id) for job_id in prev_job_ids.values())
 
 def _submit(case, job=None, no_batch=False, prereq=None, allow_fail=False, resubmit=False,
             resubmit_immediate=False, skip_pnl=False, mail_user=None, mail_type=None,
@@ -38,8 +35,6 @@ def _submit(case, job=None, no_batch=False, prereq=None, allow_fail=False, resub
     # Check if CONTINUE_RUN value makes sense
     if job != "case.test" and case.get_value("CONTINUE_RUN") and hasMediator:
         rundir = case.get_value("RUNDIR")
-        expect(os.path.isdir(rundir),
-               "CONTINUE_RUN is true but RUNDIR {} does not exist".format(rundir))
         # only checks for the first instance in a multidriver case
         if case.get_value("COMP_INTERFACE") == "nuopc":
             rpointer = "rpointer.cpl"
@@ -47,39 +42,48 @@ def _submit(case, job=None, no_batch=False, prereq=None, allow_fail=False, resub
             rpointer = "rpointer.drv_0001"
         else:
             rpointer = "rpointer.drv"
-        expect(os.path.exists(os.path.join(rundir,rpointer)),
-               "CONTINUE_RUN is true but this case does not appear to have restart files staged in {} {}".format(rundir,rpointer))
-        # Finally we open the rpointer file and check that it's correct
+        # Open the rpointer file directly rather than testing for RUNDIR and
+        # the file first; only look at RUNDIR to report why the open failed
+        try:
+            with open(os.path.join(rundir,rpointer), "r") as fd:
+                ncfile = fd.readline().strip()
+        except (IOError, OSError):
+            expect(os.path.isdir(rundir),
+                   "CONTINUE_RUN is true but RUNDIR {} does not exist".format(rundir))
+            expect(False,
+                   "CONTINUE_RUN is true but this case does not appear to have restart files staged in {} {}".format(rundir,rpointer))
+        # Finally check that the rpointer file is correct
         casename = case.get_value("CASE")
-        with open(os.path.join(rundir,rpointer), "r") as fd:
-            ncfile = fd.readline().strip()
-            expect(ncfile.startswith(casename) and
-                   os.path.exists(os.path.join(rundir,ncfile)),
-                   "File {ncfile} not present or does not match case {casename}".
-                   format(ncfile=os.path.join(rundir,ncfile),casename=casename))
+        expect(ncfile.startswith(casename) and
+               os.path.exists(os.path.join(rundir,ncfile)),
+               "File {ncfile} not present or does not match case {casename}".
+               format(ncfile=os.path.join(rundir,ncfile),casename=casename))
 
     # if case.submit is called with the no_batch flag then we assume that this
     # flag will stay in effect for the duration of the RESUBMITs
     env_batch = case.get_env("batch")
+    env_batch_file = os.path.basename(env_batch.filename)
     external_workflow = case.get_value("EXTERNAL_WORKFLOW")
-    if env_batch.get_batch_system_type() == "none" or resubmit and external_workflow:
+    batch_system = env_batch.get_batch_system_type()
+    if batch_system == "none" or resubmit and external_workflow:
         no_batch = True
 
     if no_batch:
         batch_system = "none"
-    else:
-        batch_system = env_batch.get_batch_system_type()
-    unlock_file(os.path.basename(env_batch.filename))
     case.set_value("BATCH_SYSTEM", batch_system)
 
+    # Compare against the locked copy before unlocking it, since that removes
+    # it. The comparison is only needed to decide whether to regenerate the
+    # batch scripts, so skip it when there are none to write
     env_batch_has_changed = False
-    if not external_workflow:
+    if batch_system != "none" and not external_workflow:
         try:
-            case.check_lockedfile(os.path.basename(env_batch.filename))
-        except:
+            case.check_lockedfile(env_batch_file)
+        except CIMEError:
             env_batch_has_changed = True
+    unlock_file(env_batch_file)
 
-    if batch_system != "none" and env_batch_has_changed and not external_workflow:
+    if env_batch_has_changed:
         # May need to regen batch files if user made batch setting changes (e.g. walltime, queue, etc)
         logger.warning(\
 """
@@ -88,7 +92,7 @@ manual edits to these file will be lost!
 """)
         env_batch.make_all_batch_files(case)
     case.flush()
-    lock_file(os.path.basename(env_batch.filename))
+    lock_file(env_batch_file)
 
     if resubmit:
         # This is a resubmission, do not reinitialize test values
@@ -105,31 +109,6 @@ manual edits to these file will be lost!
         if job == "case.test":
             case.set_value("IS_FIRST_RUN", True)
 
-        if no_batch:
-            batch_system = "none"
-        else:
-            batch_system = env_batch.get_batch_system_type()
-
-        case.set_value("BATCH_SYSTEM", batch_system)
-
-        env_batch_has_changed = False
-        try:
-            case.check_lockedfile(os.path.basename(env_batch.filename))
-        except CIMEError:
-            env_batch_has_changed = True
-
-        if env_batch.get_batch_system_type() != "none" and env_batch_has_changed:
-            # May need to regen batch files if user made batch setting changes (e.g. walltime, queue, etc)
-            logger.warning(\
-"""
-env_batch.xml appears to have changed, regenerating batch scripts
-manual edits to these file will be lost!
-""")
-            env_batch.make_all_batch_files(case)
-
-        unlock_file(os.path.basename(env_batch.filename))
-        lock_file(os.path.basename(env_batch.filename))
-
         case.check_case(skip_pnl=skip_pnl, chksum=chksum)
         if job == case.get_primary_job():
             case.check_DA_settings()
@@ -148,13 +127,11 @@ manual edits to these file will be lost!
                                allow_fail=allow_fail, mail_user=mail_user,
                                mail_type=mail_type, batch_args=batch_args, workflow=workflow)
 
-    xml_jobids = []
     for jobname, jobid in job_ids.items():
         logger.info("Submitted job {} with id {}".format(jobname, jobid))
-        if jobid:
-            xml_jobids.append("{}:{}".format(jobname, jobid))
 
-    xml_jobid_text = ", ".join(xml_jobids)
+    xml_jobid_text = ", ".join("{}:{}".format(jobname, jobid)
+                               for jobname, jobid in job_ids.items() if jobid)
     if xml_jobid_text:
         case.set_value("JOB_IDS", xml_jobid_text)
 
@@ -168,7 +145,8 @@ def submit(self, job=None, no_batch=False, prereq=None, allow_fail=False, resubm
         resubmit_immediate = False
 
     caseroot = self.get_value("CASEROOT")
-    if self.get_value("TEST"):
+    is_test = self.get_value("TEST")
+    if is_test:
         casebaseid = self.get_value("CASEBASEID")
         # This should take care of the race condition where the submitted job
         # begins immediately and tries to set RUN phase. We proactively assume
@@ -181,11 +159,11 @@ def submit(self, job=None, no_batch=False, prereq=None, allow_fail=False, resubm
                 ts.set_status(SUBMIT_PHASE, TEST_PASS_STATUS)
 
     # If this is a resubmit check the hidden file .submit_options for
-    # any submit options used on the original submit and use them again
+    # any submit options used on the original submit and use them again.
+    # RawConfigParser.read skips a missing file, so no existence test is needed
     submit_options = os.path.join(caseroot, ".submit_options")
-    if resubmit and os.path.exists(submit_options):
-        config = configparser.RawConfigParser()
-        config.read(submit_options)
+    config = configparser.RawConfigParser()
+    if resubmit and config.read(submit_options):
         if not skip_pnl and config.has_option('SubmitOptions','skip_pnl'):
             skip_pnl = config.getboolean('SubmitOptions', 'skip_pnl')
         if mail_user is None and config.has_option('SubmitOptions', 'mail_user'):
@@ -210,7 +188,7 @@ def submit(self, job=None, no_batch=False, prereq=None, allow_fail=False, resubm
     except BaseException: # Want to catch KeyboardInterrupt too
         # If something failed in the batch system, make sure to mark
         # the test as failed if we are running a test.
-        if self.get_value("TEST"):
+        if is_test:
             with TestStatus(test_dir=caseroot, test_name=casebaseid) as ts:
                 ts.set_status(SUBMIT_PHASE, TEST_FAIL_STATUS)
 
@@ -234,6 +212,6 @@ def check_case(self, skip_pnl=False, chksum=False):
 def check_DA_settings(self):
     script = self.get_value("DATA_ASSIMILATION_SCRIPT")
     cycles = self.get_value("DATA_ASSIMILATION_CYCLES")
-    if len(script) > 0 and os.path.isfile(script) and cycles > 0:
+    if script and cycles > 0 and os.path.isfile(script):
         logger.info("Data Assimilation enabled using script {} with {:d} cycles".format(script,
                                                                                         cycles))
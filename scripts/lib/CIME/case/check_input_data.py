@@ -7,11 +7,15 @@ from CIME.XML.inputdata import Inputdata
 import CIME.Servers
 
 import glob, hashlib, shutil
+from multiprocessing.dummy import Pool as ThreadPool
 
 logger = logging.getLogger(__name__)
 # The inputdata_checksum.dat file will be read into this hash if it's available
 chksum_hash = dict()
 local_chksum_file = 'inputdata_checksum.dat'
+# Input data usually lives on a shared filesystem where each stat is a
+# round trip to a metadata server, so existence checks are overlapped
+_STAT_THREADS = 8
 
 def _download_checksum_file(rundir):
     """
@@ -107,6 +111,27 @@ def _merge_chksum_files(new_file, old_file):
     os.remove(old_file)
 
 
+def _find_existing_paths(paths):
+    """
+    Return a dict telling whether each of paths exists, checking them concurrently
+    """
+    paths = list(set(paths))
+    if len(paths) < 2:
+        return dict((path, os.path.exists(path)) for path in paths)
+
+    pool = ThreadPool(min(_STAT_THREADS, len(paths)))
+    exists = pool.map(os.path.exists, paths)
+    pool.close()
+    pool.join()
+    return dict(zip(paths, exists))
+
+def _path_exists(path, existing):
+    """
+    Look path up in the dict returned by _find_existing_paths, or stat it if
+    it was not checked there
+    """
+    found = None if existing is None else existing.get(path)
+    return os.path.exists(path) if found is None else found
 
 def _download_if_in_repo(server, input_data_root, rel_path, isdirectory=False, ic_filepath=None):
     """
@@ -314,9 +339,9 @@ def check_input_data(case, protocol="svn", address=None, input_data_root=None, d
         with open(data_list_file, "r") as fd:
             lines = fd.readlines()
 
+        entries = []
         for line in lines:
             line = line.strip()
-            use_ic_path = False
             if (line and not line.startswith("#")):
                 tokens = line.split('=')
                 description, full_path = tokens[0].strip(), tokens[1].strip()
@@ -332,80 +357,92 @@ def check_input_data(case, protocol="svn", address=None, input_data_root=None, d
                 if(full_path):
                     # expand xml variables
                     full_path = case.get_resolved_value(full_path)
-                    rel_path = full_path
-                    if input_ic_root and input_ic_root in full_path \
-                       and ic_filepath:
-                        rel_path = full_path.replace(input_ic_root, ic_filepath)
-                        use_ic_path = True
-                    elif input_data_root in full_path:
-                        rel_path  = full_path.replace(input_data_root, "")
-                    elif input_ic_root and \
-                         (input_ic_root not in input_data_root and input_ic_root in full_path):
-                        if ic_filepath:
-                            rel_path  = full_path.replace(input_ic_root, ic_filepath)
-                        use_ic_path = True
-                    model = os.path.basename(data_list_file).split('.')[0]
-                    isdirectory=rel_path.endswith(os.sep)
-
-                    if ("/" in rel_path and rel_path == full_path and not full_path.startswith('unknown')):
-                        # User pointing to a file outside of input_data_root, we cannot determine
-                        # rel_path, and so cannot download the file. If it already exists, we can
-                        # proceed
-                        if not os.path.exists(full_path):
-                            print("Model {} missing file {} = '{}'".format(model, description, full_path))
-                            # Data download path must be DIN_LOC_ROOT, DIN_LOC_IC or RUNDIR
-
-                            rundir = case.get_value("RUNDIR")
-                            if download:
-                                if full_path.startswith(rundir):
-                                    filepath = os.path.dirname(full_path)
-                                    if not os.path.exists(filepath):
-                                        logger.info("Creating directory {}".format(filepath))
-                                        os.makedirs(filepath)
-                                    tmppath = full_path[len(rundir)+1:]
-                                    success = _download_if_in_repo(server, os.path.join(rundir,"inputdata"),
-                                                                   tmppath[10:],
-                                                                   isdirectory=isdirectory, ic_filepath='/')
-                                    no_files_missing = success
-                                else:
-                                    logger.warning("    Cannot download file since it lives outside of the input_data_root '{}'".format(input_data_root))
+                entries.append((description, full_path))
+
+        # Downloads below may create files, so only a pure check can rely on
+        # a snapshot of which files exist. Values without a '/' (e.g. NULL or
+        # same_as_TS) and unknown* paths are never looked up, so skip them.
+        existing = None if download else _find_existing_paths(
+            full_path for _, full_path in entries
+            if full_path and "/" in full_path and not full_path.startswith('unknown'))
+
+        for description, full_path in entries:
+            use_ic_path = False
+            if(full_path):
+                rel_path = full_path
+                if input_ic_root and input_ic_root in full_path \
+                   and ic_filepath:
+                    rel_path = full_path.replace(input_ic_root, ic_filepath)
+                    use_ic_path = True
+                elif input_data_root in full_path:
+                    rel_path  = full_path.replace(input_data_root, "")
+                elif input_ic_root and \
+                     (input_ic_root not in input_data_root and input_ic_root in full_path):
+                    if ic_filepath:
+                        rel_path  = full_path.replace(input_ic_root, ic_filepath)
+                    use_ic_path = True
+                model = os.path.basename(data_list_file).split('.')[0]
+                isdirectory=rel_path.endswith(os.sep)
+
+                if ("/" in rel_path and rel_path == full_path and not full_path.startswith('unknown')):
+                    # User pointing to a file outside of input_data_root, we cannot determine
+                    # rel_path, and so cannot download the file. If it already exists, we can
+                    # proceed
+                    if not _path_exists(full_path, existing):
+                        print("Model {} missing file {} = '{}'".format(model, description, full_path))
+                        # Data download path must be DIN_LOC_ROOT, DIN_LOC_IC or RUNDIR
+
+                        rundir = case.get_value("RUNDIR")
+                        if download:
+                            if full_path.startswith(rundir):
+                                filepath = os.path.dirname(full_path)
+                                if not os.path.exists(filepath):
+                                    logger.info("Creating directory {}".format(filepath))
+                                    os.makedirs(filepath)
+                                tmppath = full_path[len(rundir)+1:]
+                                success = _download_if_in_repo(server, os.path.join(rundir,"inputdata"),
+                                                               tmppath[10:],
+                                                               isdirectory=isdirectory, ic_filepath='/')
+                                no_files_missing = success
                             else:
-                                no_files_missing = False
+                                logger.warning("    Cannot download file since it lives outside of the input_data_root '{}'".format(input_data_root))
                         else:
-                            logger.debug("  Found input file: '{}'".format(full_path))
+                            no_files_missing = False
                     else:
-                        # There are some special values of rel_path that
-                        # we need to ignore - some of the component models
-                        # set things like 'NULL' or 'same_as_TS' -
-                        # basically if rel_path does not contain '/' (a
-                        # directory tree) you can assume it's a special
-                        # value and ignore it (perhaps with a warning)
-
-                        if ("/" in rel_path and not os.path.exists(full_path) and not full_path.startswith('unknown')):
-                            print("Model {} missing file {} = '{}'".format(model, description, full_path))
-                            if (download):
-                                if use_ic_path:
-                                    success = _download_if_in_repo(server,
-                                                                            input_ic_root, rel_path.strip(os.sep),
-                                                                            isdirectory=isdirectory, ic_filepath=ic_filepath)
-                                else:
-                                    success = _download_if_in_repo(server,
-                                                                            input_data_root, rel_path.strip(os.sep),
-                                                                            isdirectory=isdirectory, ic_filepath=ic_filepath)
-                                if not success:
-                                    no_files_missing = False
-                                if success and chksum:
-                                    verify_chksum(input_data_root, rundir, rel_path.strip(os.sep), isdirectory)
+                        logger.debug("  Found input file: '{}'".format(full_path))
+                else:
+                    # There are some special values of rel_path that
+                    # we need to ignore - some of the component models
+                    # set things like 'NULL' or 'same_as_TS' -
+                    # basically if rel_path does not contain '/' (a
+                    # directory tree) you can assume it's a special
+                    # value and ignore it (perhaps with a warning)
+
+                    if ("/" in rel_path and not full_path.startswith('unknown') and not _path_exists(full_path, existing)):
+                        print("Model {} missing file {} = '{}'".format(model, description, full_path))
+                        if (download):
+                            if use_ic_path:
+                                success = _download_if_in_repo(server,
+                                                                        input_ic_root, rel_path.strip(os.sep),
+                                                                        isdirectory=isdirectory, ic_filepath=ic_filepath)
                             else:
+                                success = _download_if_in_repo(server,
+                                                                        input_data_root, rel_path.strip(os.sep),
+                                                                        isdirectory=isdirectory, ic_filepath=ic_filepath)
+                            if not success:
                                 no_files_missing = False
-                        else:
-                            if chksum:
+                            if success and chksum:
                                 verify_chksum(input_data_root, rundir, rel_path.strip(os.sep), isdirectory)
-                                logger.info("Chksum passed for file {}".format(os.path.join(input_data_root,rel_path)))
-                            logger.debug("  Already had input file: '{}'".format(full_path))
-                else:
-                    model = os.path.basename(data_list_file).split('.')[0]
-                    logger.warning("Model {} no file specified for {}".format(model, description))
+                        else:
+                            no_files_missing = False
+                    else:
+                        if chksum:
+                            verify_chksum(input_data_root, rundir, rel_path.strip(os.sep), isdirectory)
+                            logger.info("Chksum passed for file {}".format(os.path.join(input_data_root,rel_path)))
+                        logger.debug("  Already had input file: '{}'".format(full_path))
+            else:
+                model = os.path.basename(data_list_file).split('.')[0]
+                logger.warning("Model {} no file specified for {}".format(model, description))
 
     return no_files_missing
 
@@ -12,6 +12,12 @@ import datetime, re
 
 logger = logging.getLogger(__name__)
 
+# Length in days of each NCPL_BASE_PERIOD
+_NCPL_BASE_PERIOD_DAYS = {"decade" : 3650.0,
+                          "year"   : 365.0,
+                          "day"    : 1.0,
+                          "hour"   : 1.0/24.0}
+
 class _GetTimingInfo:
     def __init__(self, name):
         self.name = name
@@ -263,7 +269,6 @@ class _TimingParser:
         if compset is None:
             compset = ""
         grid = self.case.get_value("GRID")
-        run_type = self.case.get_value("RUN_TYPE")
         stop_option = self.case.get_value("STOP_OPTION")
         stop_n = self.case.get_value("STOP_N")
 
@@ -333,17 +338,10 @@ class _TimingParser:
             logger.critical("Unable to open file {}".format(finfilename))
             raise e
 
-        tlen = 1.0
-        if ncpl_base_period == "decade":
-            tlen = 3650.0
-        elif ncpl_base_period == "year":
-            tlen = 365.0
-        elif ncpl_base_period == "day":
-            tlen = 1.0
-        elif ncpl_base_period == "hour":
-            tlen = 1.0/24.0
-        else:
+        tlen = _NCPL_BASE_PERIOD_DAYS.get(ncpl_base_period)
+        if tlen is None:
             logger.warning("Unknown NCPL_BASE_PERIOD={}".format(ncpl_base_period))
+            tlen = 1.0
 
 
         # at this point the routine becomes driver specific
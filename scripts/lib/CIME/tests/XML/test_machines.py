@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+"""
+This module tests *some* functionality of CIME.XML.machines
+"""
+
+# Ignore privacy concerns for unit tests, so that unit tests can access
+# protected members of the system under test
+#
+# pylint:disable=protected-access
+
+import io
+import unittest
+from unittest import mock
+import os
+import shutil
+import string
+import tempfile
+from CIME.XML.machines import Machines
+
+class TestMachines(unittest.TestCase):
+    """Tests some functionality of CIME.XML.machines
+
+    Note that much of the functionality of CIME.XML.machines is NOT covered here
+    """
+
+    _CONFIG_MACHINES_TEMPLATE = string.Template("""<?xml version="1.0"?>
+
+<config_machines version="2.0">
+$MACHINE_ENTRIES
+</config_machines>
+""")
+
+    _MACHINE_TEMPLATE = string.Template("""
+  <machine MACH="$MACH">
+    <DESC>$MACH test machine</DESC>
+    $NODENAME_REGEX
+    <OS>LINUX</OS>
+    <COMPILERS>gnu,intel</COMPILERS>
+    <MPILIBS>openmpi,mpi-serial</MPILIBS>
+    <CIME_OUTPUT_ROOT>$$ENV{CIME_TEST_MACHINES_ROOT}/scratch</CIME_OUTPUT_ROOT>
+    <DIN_LOC_ROOT>$$CIME_TEST_MACHINES_DIN/inputdata</DIN_LOC_ROOT>
+    <DOUT_S_ROOT>$${CIME_OUTPUT_ROOT}/archive</DOUT_S_ROOT>
+    <BATCH_SYSTEM>none</BATCH_SYSTEM>
+    <SUPPORTED_BY>nobody</SUPPORTED_BY>
+    <MAX_TASKS_PER_NODE>8</MAX_TASKS_PER_NODE>
+    <MAX_MPITASKS_PER_NODE>8</MAX_MPITASKS_PER_NODE>
+    <mpirun mpilib="default">
+      <executable>mpirun</executable>
+    </mpirun>
+    <module_system type="none"/>
+  </machine>
+""")
+
+    def setUp(self):
+        self._workdir = tempfile.mkdtemp()
+        self._xml_filepath = os.path.join(self._workdir, "config_machines.xml")
+
+    def tearDown(self):
+        shutil.rmtree(self._workdir)
+
+    def _create_machines_file(self, regexes, filepath=None):
+        """Creates a config_machines.xml file (by default self._xml_filepath),
+        where regexes is a list of (machine name, NODENAME_REGEX text or None)
+        tuples"""
+        entries = ""
+        for mach, regex in regexes:
+            regex_node = "" if regex is None else "<NODENAME_REGEX>{}</NODENAME_REGEX>".format(regex)
+            entries += self._MACHINE_TEMPLATE.substitute(MACH=mach, NODENAME_REGEX=regex_node)
+
+        with open(self._xml_filepath if filepath is None else filepath, "w") as xml_file:
+            xml_file.write(self._CONFIG_MACHINES_TEMPLATE.substitute(MACHINE_ENTRIES=entries))
+
+    def test_probe_first_match_wins(self):
+        """The first machine in the file whose regex matches is returned"""
+        self._create_machines_file([("alpha", "alpha\\d+"),
+                                    ("beta", ".*\\.example\\.org"),
+                                    ("gamma", "gamma"),
+                                    ("delta", "(login[1-2]|node[0-9]*)\\.example\\.org"),
+                                    ("epsilon", None)])
+        machobj = Machines(infile=self._xml_filepath, machine="alpha")
+
+        self.assertEqual(machobj._probe_machine_name_one_guess("alpha12"), "alpha")
+        self.assertEqual(machobj._probe_machine_name_one_guess("login1.example.org"), "beta")
+        self.assertEqual(machobj._probe_machine_name_one_guess("gamma3"), "gamma")
+        self.assertEqual(machobj._probe_machine_name_one_guess("epsilon"), "epsilon")
+        self.assertIsNone(machobj._probe_machine_name_one_guess("zeta"))
+        self.assertIsNotNone(machobj._combined_node_regex)
+
+    def test_probe_with_backreference(self):
+        """Patterns that cannot be combined are still matched in file order"""
+        self._create_machines_file([("alpha", "(a)b\\1"),
+                                    ("beta", "(?P&lt;host&gt;beta)"),
+                                    ("gamma", "gamma")])
+        machobj = Machines(infile=self._xml_filepath, machine="alpha")
+
+        self.assertEqual(machobj._probe_machine_name_one_guess("aba"), "alpha")
+        self.assertIsNone(machobj._probe_machine_name_one_guess("abb"))
+        self.assertEqual(machobj._probe_machine_name_one_guess("beta"), "beta")
+        self.assertEqual(machobj._probe_machine_name_one_guess("gamma3"), "gamma")
+        self.assertIsNone(machobj._probe_machine_name_one_guess("agamma"))
+        self.assertIsNone(machobj._combined_node_regex)
+
+    def test_probe_with_inline_flag(self):
+        """An inline flag in one pattern does not apply to the others"""
+        self._create_machines_file([("alpha", "(?i)alpha\\d"),
+                                    ("beta", "beta\\.org")])
+        machobj = Machines(infile=self._xml_filepath, machine="alpha")
+
+        self.assertEqual(machobj._probe_machine_name_one_guess("ALPHA1"), "alpha")
+        self.assertEqual(machobj._probe_machine_name_one_guess("beta.org"), "beta")
+        self.assertIsNone(machobj._probe_machine_name_one_guess("BETA.ORG"))
+        self.assertIsNone(machobj._combined_node_regex)
+
+    def test_read_appended_file(self):
+        """Machines from a file read after construction are found"""
+        self._create_machines_file([("alpha", "alpha\\d")])
+        machobj = Machines(infile=self._xml_filepath, machine="alpha")
+        self.assertEqual(machobj.list_available_machines(), ["alpha"])
+        self.assertIsNone(machobj._probe_machine_name_one_guess("beta1"))
+
+        extra_filepath = os.path.join(self._workdir, "extra_config_machines.xml")
+        self._create_machines_file([("beta", "beta\\d")], filepath=extra_filepath)
+        machobj.read(extra_filepath)
+
+        self.assertEqual(machobj.list_available_machines(), ["alpha", "beta"])
+        self.assertEqual(machobj._probe_machine_name_one_guess("beta1"), "beta")
+        machobj.set_machine("beta")
+        self.assertEqual(machobj.get_machine_name(), "beta")
+
+    def test_extra_machines_dir_without_file(self):
+        """An extra_machines_dir with no config_machines.xml is ignored"""
+        self._create_machines_file([("alpha", None)])
+        extra_dir = os.path.join(self._workdir, "extra")
+        os.makedirs(extra_dir)
+
+        with mock.patch.dict(os.environ, {"HOME": self._workdir}):
+            machobj = Machines(infile=self._xml_filepath, machine="alpha",
+                               extra_machines_dir=extra_dir)
+
+        self.assertEqual(machobj.list_available_machines(), ["alpha"])
+
+    def test_extra_machines_dir_missing_include(self):
+        """A file missing from an include in an extra config_machines.xml is an error"""
+        self._create_machines_file([("alpha", None)])
+        extra_dir = os.path.join(self._workdir, "extra")
+        os.makedirs(extra_dir)
+        with open(os.path.join(extra_dir, "config_machines.xml"), "w") as xml_file:
+            xml_file.write('<?xml version="1.0"?>\n'
+                           '<config_machines version="2.0" xmlns:xi="http://www.w3.org/2001/XInclude">\n'
+                           '  <xi:include href="missing_machines.xml"/>\n'
+                           '</config_machines>\n')
+
+        with mock.patch.dict(os.environ, {"HOME": self._workdir}):
+            with self.assertRaises((IOError, OSError)):
+                Machines(infile=self._xml_filepath, machine="alpha",
+                         extra_machines_dir=extra_dir)
+
+    def test_get_value_cached(self):
+        """Values are cached until set_value or set_machine is called"""
+        self._create_machines_file([("alpha", None), ("beta", None)])
+        machobj = Machines(infile=self._xml_filepath, machine="alpha")
+
+        self.assertEqual(machobj.get_value("MAX_TASKS_PER_NODE"), 8)
+        self.assertEqual(machobj.get_value("MPILIB"), "openmpi")
+        self.assertIn(("MAX_TASKS_PER_NODE", None, True), machobj._value_cache)
+
+        machobj.set_value("MPILIBS", "mpi-serial")
+        self.assertEqual(machobj._value_cache, {})
+        self.assertEqual(machobj.get_value("MPILIB"), "mpi-serial")
+
+        machobj.set_machine("beta")
+        self.assertEqual(machobj._value_cache, {})
+
+    def test_get_value_env_not_cached(self):
+        """Values that depend on the environment are never cached"""
+        self._create_machines_file([("alpha", None)])
+        machobj = Machines(infile=self._xml_filepath, machine="alpha")
+
+        with mock.patch.dict(os.environ, {"CIME_TEST_MACHINES_ROOT": "/one",
+                                          "CIME_TEST_MACHINES_ONLY": "yes"}):
+            self.assertEqual(machobj.get_value("CIME_OUTPUT_ROOT"), "/one/scratch")
+            self.assertEqual(machobj.get_value("DOUT_S_ROOT"), "/one/scratch/archive")
+            self.assertEqual(machobj.get_value("CIME_TEST_MACHINES_ONLY"), "yes")
+
+        # The xml miss is remembered, only the environment is consulted again
+        self.assertIsNone(machobj._text_cache[("CIME_TEST_MACHINES_ONLY", None)])
+
+        with mock.patch.dict(os.environ, {"CIME_TEST_MACHINES_ROOT": "/two"}):
+            self.assertEqual(machobj.get_value("CIME_OUTPUT_ROOT"), "/two/scratch")
+            self.assertEqual(machobj.get_value("DOUT_S_ROOT"), "/two/scratch/archive")
+            self.assertIsNone(machobj.get_value("CIME_TEST_MACHINES_ONLY"))
+
+    def test_get_value_env_set_after_miss(self):
+        """A variable missing from the environment is looked up again later"""
+        self._create_machines_file([("alpha", None)])
+        machobj = Machines(infile=self._xml_filepath, machine="alpha")
+
+        with mock.patch.dict(os.environ):
+            os.environ.pop("CIME_TEST_MACHINES_DIN", None)
+            self.assertIsNone(machobj.get_value("CIME_TEST_MACHINES_DIN"))
+            self.assertEqual(machobj.get_value("DIN_LOC_ROOT"), "$CIME_TEST_MACHINES_DIN/inputdata")
+
+            os.environ["CIME_TEST_MACHINES_DIN"] = "/x"
+            self.assertEqual(machobj.get_value("CIME_TEST_MACHINES_DIN"), "/x")
+            self.assertEqual(machobj.get_value("DIN_LOC_ROOT"), "/x/inputdata")
+
+    def test_return_values(self):
+        """return_values reports every field for every machine"""
+        self._create_machines_file([("alpha", None), ("beta", None)])
+        machobj = Machines(infile=self._xml_filepath, machine="alpha")
+
+        mach_dict = machobj.return_values()
+
+        self.assertEqual(len(mach_dict), 12)
+        self.assertEqual(mach_dict[("beta", "description")], "beta test machine")
+        self.assertEqual(mach_dict[("alpha", "os")], "LINUX")
+        self.assertEqual(mach_dict[("alpha", "compilers")], "gnu,intel")
+        self.assertEqual(mach_dict[("alpha", "max_tasks_per_node")], "8")
+        self.assertEqual(mach_dict[("alpha", "max_mpitasks_per_node")], "8")
+        self.assertIsNone(mach_dict[("alpha", "max_gpus_per_node")])
+
+    def test_return_values_compiler_specific(self):
+        """return_values reports the entry without a compiler attribute"""
+        self._create_machines_file([("alpha", None)])
+        with open(self._xml_filepath) as xml_file:
+            contents = xml_file.read()
+        contents = contents.replace(
+            "<MAX_TASKS_PER_NODE>8</MAX_TASKS_PER_NODE>",
+            "<MAX_TASKS_PER_NODE compiler=\"gnu\">16</MAX_TASKS_PER_NODE>\n"
+            "    <MAX_TASKS_PER_NODE>36</MAX_TASKS_PER_NODE>\n"
+            "    <MAX_TASKS_PER_NODE compiler=\"intel\">72</MAX_TASKS_PER_NODE>")
+        contents = contents.replace(
+            "<MAX_MPITASKS_PER_NODE>8</MAX_MPITASKS_PER_NODE>",
+            "<MAX_MPITASKS_PER_NODE compiler=\"intel\">72</MAX_MPITASKS_PER_NODE>")
+        with open(self._xml_filepath, "w") as xml_file:
+            xml_file.write(contents)
+        machobj = Machines(infile=self._xml_filepath, machine="alpha")
+
+        mach_dict = machobj.return_values()
+
+        self.assertEqual(mach_dict[("alpha", "max_tasks_per_node")], "36")
+        # a single compiler specific entry is still reported, as get_child does
+        self.assertEqual(mach_dict[("alpha", "max_mpitasks_per_node")], "72")
+
+    def test_print_values(self):
+        """print_values writes a summary of every machine"""
+        self._create_machines_file([("alpha", None), ("beta", None)])
+        machobj = Machines(infile=self._xml_filepath, machine="alpha")
+
+        out = io.StringIO()
+        machobj.print_values(out=out)
+
+        expected = ""
+        for mach in ("alpha", "beta"):
+            expected += ("  {0} : {0} test machine \n"
+                         "      os              LINUX\n"
+                         "      compilers       gnu,intel\n"
+                         "      pes/node        8\n"
+                         "      max_tasks/node  8\n").format(mach)
+        self.assertEqual(out.getvalue(), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,6 +26,37 @@ class TestCaseSubmit(unittest.TestCase):
 
         case.check_case.assert_called_with(skip_pnl=False, chksum=True)
 
+    @mock.patch("CIME.case.case_submit.lock_file")
+    @mock.patch("CIME.case.case_submit.unlock_file")
+    def test__submit_env_batch_unchanged(self, unlock_file, lock_file): # pylint: disable=unused-argument
+        case = mock.MagicMock()
+        case.get_value.return_value = False
+        env_batch = case.get_env.return_value
+        env_batch.filename = "/caseroot/env_batch.xml"
+        env_batch.get_batch_system_type.return_value = "slurm"
+        # the locked copy must still exist when it is compared
+        case.check_lockedfile.side_effect = lambda _: unlock_file.assert_not_called()
+
+        case_submit._submit(case, job="case.run", chksum=True) # pylint: disable=protected-access
+
+        case.check_lockedfile.assert_called_once_with("env_batch.xml")
+        unlock_file.assert_called_once_with("env_batch.xml")
+        env_batch.make_all_batch_files.assert_not_called()
+
+    @mock.patch("CIME.case.case_submit.lock_file")
+    @mock.patch("CIME.case.case_submit.unlock_file")
+    def test__submit_env_batch_changed(self, unlock_file, lock_file): # pylint: disable=unused-argument
+        case = mock.MagicMock()
+        case.get_value.return_value = False
+        env_batch = case.get_env.return_value
+        env_batch.filename = "/caseroot/env_batch.xml"
+        env_batch.get_batch_system_type.return_value = "slurm"
+        case.check_lockedfile.side_effect = cime_utils.CIMEError("changed")
+
+        case_submit._submit(case, job="case.run", chksum=True) # pylint: disable=protected-access
+
+        env_batch.make_all_batch_files.assert_called_once_with(case)
+
     @mock.patch("CIME.case.case_submit._submit")
     @mock.patch("CIME.case.case.Case.initialize_derived_attributes")
     @mock.patch("CIME.case.case.Case.get_value")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+"""
+This module tests *some* functionality of CIME.case.check_input_data
+"""
+
+# Ignore privacy concerns for unit tests, so that unit tests can access
+# protected members of the system under test
+#
+# pylint:disable=protected-access
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from CIME.case import check_input_data
+
+class TestCheckInputData(unittest.TestCase):
+    """Tests the input data existence checks of CIME.case.check_input_data"""
+
+    def setUp(self):
+        self._workdir = tempfile.mkdtemp()
+        self._din_loc_root = os.path.join(self._workdir, "inputdata")
+        self._data_list_dir = os.path.join(self._workdir, "Buildconf")
+        os.makedirs(os.path.join(self._din_loc_root, "atm"))
+        os.makedirs(self._data_list_dir)
+        self._present = os.path.join(self._din_loc_root, "atm", "present.nc")
+        self._missing = os.path.join(self._din_loc_root, "atm", "missing.nc")
+        with open(self._present, "w"):
+            pass
+
+    def tearDown(self):
+        shutil.rmtree(self._workdir)
+
+    def _make_case(self):
+        case = mock.MagicMock()
+        values = {"RUNDIR" : os.path.join(self._workdir, "run"),
+                  "DIN_LOC_ROOT" : self._din_loc_root,
+                  "DIN_LOC_IC" : self._din_loc_root}
+        case.get_value.side_effect = lambda item, *_, **__: values.get(item)
+        case.get_resolved_value.side_effect = lambda value: value
+        return case
+
+    def _write_data_list(self, entries):
+        with open(os.path.join(self._data_list_dir, "cam.input_data_list"), "w") as fd:
+            fd.write("# comment\n")
+            for description, path in entries:
+                fd.write("{} = {}\n".format(description, path))
+
+    def _check(self, **kwargs):
+        return check_input_data.check_input_data(self._make_case(), data_list_dir=self._data_list_dir, **kwargs)
+
+    def test_find_existing_paths(self):
+        existing = check_input_data._find_existing_paths([self._present, self._missing, self._present])
+        self.assertEqual(existing, {self._present : True, self._missing : False})
+
+        self.assertEqual(check_input_data._find_existing_paths([self._missing]), {self._missing : False})
+        self.assertEqual(check_input_data._find_existing_paths([]), {})
+
+    def test_path_exists(self):
+        self.assertTrue(check_input_data._path_exists(self._present, None))
+        self.assertFalse(check_input_data._path_exists(self._missing, None))
+
+        # the snapshot is trusted for the paths it checked
+        self.assertFalse(check_input_data._path_exists(self._present, {self._present : False}))
+        # and anything else is stat'ed
+        self.assertTrue(check_input_data._path_exists(self._present, {self._missing : False}))
+
+    def test_existing_file(self):
+        self._write_data_list([("ncdata", self._present)])
+
+        self.assertTrue(self._check())
+
+    def test_missing_file(self):
+        self._write_data_list([("ncdata", self._present), ("bnd_file", self._missing)])
+
+        self.assertFalse(self._check())
+
+    def test_special_values_not_stat_ed(self):
+        self._write_data_list([("ncdata", self._present),
+                               ("other", "NULL"),
+                               ("same", "same_as_TS"),
+                               ("unknown_file", "unknown/file.nc")])
+
+        stat_ed = []
+        real_exists = os.path.exists
+        def recording_exists(path):
+            stat_ed.append(path)
+            return real_exists(path)
+
+        with mock.patch.object(check_input_data.os.path, "exists", side_effect=recording_exists):
+            self.assertTrue(self._check())
+
+        self.assertIn(self._present, stat_ed)
+        for path in ("NULL", "same_as_TS", "unknown/file.nc"):
+            self.assertNotIn(path, stat_ed)
+
+    @mock.patch("CIME.Servers.FTP")
+    def test_download_takes_no_snapshot(self, ftp):
+        self._write_data_list([("ncdata", self._present)])
+
+        with mock.patch.object(check_input_data, "_find_existing_paths") as find_existing_paths:
+            self.assertTrue(self._check(protocol="ftp", address="ftp.example.org", download=True))
+
+        find_existing_paths.assert_not_called()
+        ftp.ftp_login.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
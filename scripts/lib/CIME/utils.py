@@ -303,12 +303,8 @@ def get_cime_default_driver():
 
 def get_all_cime_models():
     modelsroot = os.path.join(get_cime_root(), "config")
-    models = []
-    for entry in os.listdir(modelsroot):
-        if os.path.isdir(os.path.join(modelsroot,entry)):
-            models.append(entry)
-    models.remove('xml_schemas')
-    return models
+    return [entry for entry in os.listdir(modelsroot)
+            if entry != "xml_schemas" and os.path.isdir(os.path.join(modelsroot, entry))]
 
 def set_model(model):
     """